@@ -0,0 +1,145 @@
+# Memory budgets at a reference dataset size, checked under tracemalloc:
+# each page's first render and warm rerun, a Data page hammered with filter
+# changes (twice over the same states, so growth on the second pass is a
+# leak), and what the caches hold at the end, after a sweep through more
+# distinct filter states than any cache keeps. Exits 1 over any budget.
+#   python benchmarks/bench_budgets.py [--rows 1000000] [--no-check]
+# Budgets are in MB and hold at REF_ROWS; other sizes only report.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from bench_suite import DATA_FILE, write_customers  # noqa: E402
+from explorer import SORTS  # noqa: E402
+
+REF_ROWS = 1_000_000
+PAGES    = ["overview", "profiler", "segments", "simulator", "data"]
+BUDGETS  = {                 # measured at REF_ROWS, with headroom
+    'first_peak':    320,    # any page's first render, caches filling (~160)
+    'warm_retained':   2,    # any page rerun with nothing changed
+    'warm_peak':      24,
+    'hammer_peak':    48,    # one Data page rerun with a new filter
+    'hammer_leak':     6,    # the second pass over the same filter states
+    'cached_total':  128,    # everything st.cache_resource holds, model and df included (~60)
+}
+FILTERS = [(lo, lo + span) for span in (5, 15, 30) for lo in (18, 30, 45)]   # Data page age ranges
+# 80 distinct, nearly unfiltered states: the worst case for per-state caches
+SWEEP   = [((18 + i, 80 - j), list(SORTS)[(i + j) % len(SORTS)]) for i in range(10) for j in range(8)]
+
+
+# ── in the probe process ──────────────────────────────────────
+def measure(n, tmp):
+    import tracemalloc
+    tracemalloc.start()     # before the app's imports, so memory.start() sees tracing on
+
+    from streamlit.testing.v1 import AppTest
+
+    import memory
+
+    write_customers(n, Path(tmp) / DATA_FILE)
+    mb = lambda b: round(b / 2**20, 2)
+
+    def run(at):
+        at.run()
+        if at.exception:
+            raise SystemExit(at.exception[0].value)
+        return memory.summary()[at.query_params['page']]['last']
+
+    pages = {}
+    for page in PAGES:
+        at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=600)
+        at.query_params['page'] = page
+        first, warm = run(at), run(at)
+        pages[page] = {'first_retained': mb(first['retained']), 'first_peak': mb(first['peak']),
+                       'warm_retained': mb(warm['retained']), 'warm_peak': mb(warm['peak'])}
+
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=600)
+    at.query_params['page'] = "data"
+    run(at)
+    passes, peak = [], 0
+    for _ in range(2):
+        before = tracemalloc.get_traced_memory()[0]
+        for age_r in FILTERS:
+            at.slider(key="dt_a").set_value(age_r)
+            peak = max(peak, run(at)['peak'])
+        passes.append(tracemalloc.get_traced_memory()[0] - before)
+    for age_r, sort_b in SWEEP:
+        at.slider(key="dt_a").set_value(age_r)
+        at.selectbox(key="dt_sort").set_value(sort_b)
+        run(at)
+    held = memory.footprint({})
+    return {
+        'rows': n, 'pages': pages,
+        'hammer': {'reruns': 2 * len(FILTERS), 'peak': mb(peak),
+                   'first_pass_growth': mb(passes[0]), 'leak': mb(passes[1])},
+        'sweep': len(SWEEP),
+        'cached': {k: {'entries': v['entries'], 'mb': mb(v['bytes'])} for k, v in held.items()},
+        'cached_total': mb(sum(v['bytes'] for v in held.values())),
+    }
+
+
+def probe(n):
+    with tempfile.TemporaryDirectory() as tmp:
+        env  = dict(os.environ, SEGMENTIQ_ARTIFACTS=tmp, SEGMENTIQ_DATA=str(Path(tmp) / DATA_FILE))
+        code = (f"import sys, json; sys.path.insert(0, {str(ROOT / 'benchmarks')!r}); "
+                f"import bench_budgets; print(json.dumps(bench_budgets.measure({n}, {tmp!r})))")
+        res = subprocess.run([sys.executable, "-c", code], env=env, cwd=ROOT, capture_output=True, text=True)
+        if res.returncode:
+            raise RuntimeError(f"{n:,} rows failed:\n{res.stderr[-2000:]}")
+        return json.loads(res.stdout.strip().splitlines()[-1])
+
+
+def over_budget(r):
+    worst = {
+        'first_peak':    max(p['first_peak'] for p in r['pages'].values()),
+        'warm_retained': max(p['warm_retained'] for p in r['pages'].values()),
+        'warm_peak':     max(p['warm_peak'] for p in r['pages'].values()),
+        'hammer_peak':   r['hammer']['peak'],
+        'hammer_leak':   r['hammer']['leak'],
+        'cached_total':  r['cached_total'],
+    }
+    print(f"\n{'budget':<16} {'used':>9} {'limit':>9}")
+    failed = []
+    for name, limit in BUDGETS.items():
+        flag = "  OVER" if worst[name] > limit else ""
+        print(f"{name:<16} {worst[name]:>7.1f}MB {limit:>7}MB{flag}")
+        if flag:
+            failed.append(name)
+    return failed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--rows', type=int, default=REF_ROWS)
+    ap.add_argument('--no-check', action='store_true', help="report only")
+    ap.add_argument('--out', help="write results as JSON")
+    args = ap.parse_args()
+
+    r = probe(args.rows)
+    print(f"{args.rows:,} rows")
+    print(f"{'page':<10} {'first retained':>15} {'first peak':>11} {'warm retained':>14} {'warm peak':>10}  (MB)")
+    for page, p in r['pages'].items():
+        print(f"{page:<10} {p['first_retained']:>15.1f} {p['first_peak']:>11.1f} {p['warm_retained']:>14.1f} {p['warm_peak']:>10.1f}")
+    h = r['hammer']
+    print(f"data page, {h['reruns']} filter reruns: peak {h['peak']:.1f} MB · first pass {h['first_pass_growth']:+.1f} MB"
+          f" · second pass {h['leak']:+.1f} MB")
+    print(f"cached after {r['sweep']} distinct filter states: " + " · ".join(f"{k} {v['mb']:.1f}" for k, v in r['cached'].items() if v['entries'])
+          + f" · total {r['cached_total']:.1f} MB")
+    if args.out:
+        Path(args.out).write_text(json.dumps(r, indent=2))
+    if args.no_check or args.rows != REF_ROWS:
+        return
+    failed = over_budget(r)
+    if failed:
+        print(f"\nover budget: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# Data Explorer filter/sort: per-rerun pandas path vs prebuilt bitmap/order index.
+#   python benchmarks/bench_explorer.py --rows 10000000
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from bench_training import blobs  # noqa: E402
+from explorer import SORTS, build_index, filter_index  # noqa: E402
+
+CASES = [
+    ("all rows",          (0, 1, 2, 3, 4), ("Male", "Female"), (18, 80), "Income ↓"),
+    ("one segment",       (2,),            ("Male", "Female"), (18, 80), "Spending ↑"),
+    ("segment+gender+age", (1, 3),         ("Female",),        (25, 40), "Age ↓"),
+    ("narrow",            (4,),            ("Male",),          (60, 62), "Income ↑"),
+]
+
+
+def frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X   = blobs(n, seed)
+    return pd.DataFrame({
+        'Income': X[:, 0].round(1), 'Spending': X[:, 1].round(1),
+        'Age': rng.integers(18, 70, n), 'Gender': rng.choice(["Male", "Female"], n),
+        'Cluster': rng.integers(0, 5, n),
+    })
+
+
+def pandas_path(df, seg_f, gen_f, age_r, sort_b):
+    fdf = df[df['Cluster'].isin(seg_f) & df['Gender'].isin(gen_f) & df['Age'].between(*age_r)].copy()
+    col, asc = SORTS[sort_b]
+    return fdf.sort_values(col, ascending=asc)
+
+
+def clock(f, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t = time.perf_counter(); out = f(); best = min(best, time.perf_counter() - t)
+    return best, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--rows', type=int, nargs='+', default=[10_000_000])
+    args = ap.parse_args()
+    for n in args.rows:
+        df = frame(n)
+        t_build, ix = clock(lambda: build_index(df, 5), repeat=1)
+        print(f"{n:,} rows · index build {t_build:.2f}s (one-off per model version)")
+        print(f"  {'case':<20} {'result':>11} {'pandas s':>9} {'index s':>9} {'speedup':>8}")
+        for name, *q in CASES:
+            tp, ref = clock(lambda: pandas_path(df, *q))
+            ti, idx = clock(lambda: filter_index(ix, *q))
+            assert len(idx) == len(ref) and np.array_equal(np.sort(idx), np.sort(ref.index.to_numpy()))
+            col = SORTS[q[3]][0]
+            assert np.array_equal(df[col].to_numpy()[idx], ref[col].to_numpy())
+            print(f"  {name:<20} {len(idx):>11,} {tp:>9.3f} {ti:>9.3f} {tp/ti:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
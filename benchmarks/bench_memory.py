@@ -0,0 +1,45 @@
+# Bytes per row of the customer frame: the original float64/int64/object
+# layout (plus the Data page's per-row Segment strings) vs ingest.compact().
+#   python benchmarks/bench_memory.py --rows 1000000
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from bench_training import blobs  # noqa: E402
+from ingest import compact  # noqa: E402
+from segmentation import META  # noqa: E402
+
+
+def legacy(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X   = blobs(n, seed)
+    df  = pd.DataFrame({
+        'Income': X[:, 0].round(1), 'Spending': X[:, 1].round(1),
+        'Age': rng.integers(18, 70, n), 'Gender': rng.choice(["Male", "Female"], n).astype(object),
+        'Cluster': rng.integers(0, 5, n),
+    })
+    return df
+
+
+def report(name, df, n):
+    cols  = df.memory_usage(deep=True, index=False)
+    print(f"  {name:<8} {cols.sum()/n:>7.1f} B/row   " + "  ".join(f"{c} {b/n:.1f}" for c, b in cols.items()))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--rows', type=int, default=1_000_000)
+    n  = ap.parse_args().rows
+    df = legacy(n)
+    print(f"{n:,} rows")
+    with_seg = df.assign(Segment=df['Cluster'].map(lambda x: META[x]['name']))
+    report("before", with_seg, n)
+    report("after", compact(df), n)
+
+
+if __name__ == '__main__':
+    main()
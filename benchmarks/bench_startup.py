@@ -0,0 +1,50 @@
+# Cold vs warm start of app.py, each in a fresh interpreter: ms to the end of
+# the imports, to first paint (nav + header sent) and to the model being ready,
+# and whether sklearn was imported at all.
+#   python benchmarks/bench_startup.py [--data customers.csv]
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import json, sys
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+import startup
+at = AppTest.from_file({app!r}, default_timeout=600)
+at.run()
+if at.exception:
+    raise SystemExit(at.exception[0].value)
+print(json.dumps(startup.report()))
+"""
+
+
+def probe(env):
+    out = subprocess.run([sys.executable, "-c", PROBE.format(root=str(ROOT), app=str(ROOT / "app.py"))],
+                         env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--data', help="customer file to serve (default: synthetic demo data)")
+    args = ap.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, SEGMENTIQ_ARTIFACTS=tmp)
+        if args.data:
+            env['SEGMENTIQ_DATA'] = str(Path(args.data).resolve())
+        print(f"{'':<6} {'imports':>9} {'first paint':>12} {'model ready':>12}  sklearn")
+        for name in ("cold", "warm"):
+            r = probe(env)
+            print(f"{name:<6} {r['imports']:>7.0f}ms {r['first_paint']:>10.0f}ms {r['model_ready']:>10.0f}ms  "
+                  f"{'imported' if r['sklearn_imported'] else 'not imported'}")
+
+
+if __name__ == '__main__':
+    main()
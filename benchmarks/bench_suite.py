@@ -0,0 +1,192 @@
+# The app's hot paths at each dataset size, written as JSON and compared
+# against a baseline run; exits 1 when anything regressed past --tolerance.
+#   python benchmarks/bench_suite.py --rows 200 100000 10000000 --out bench.json
+#   python benchmarks/bench_suite.py --baseline bench.json --out new.json
+# Every size runs in a fresh interpreter with its own artifact store, so the
+# first build() is a true cold load (scan + fit + label + store) and the
+# app's st.cache_resource functions start empty. Sizes up to AUTO_ROWS also
+# time a full-batch fit in memory, the path used when SEGMENTIQ_DATA is unset.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from bench_training import blobs  # noqa: E402
+
+SIZES = [200, 10_000, 100_000, 1_000_000, 10_000_000]
+try:
+    import pyarrow  # noqa: F401
+    DATA_FILE = "customers.parquet"
+except ImportError:
+    DATA_FILE = "customers.csv"
+QUERY = ((1, 3), ("Female",), (25, 40), "Age ↓")   # a mid-selectivity Data page filter
+
+
+def write_customers(n, path, seed=0):
+    rng = np.random.default_rng(seed)
+    X   = blobs(n, seed)
+    df  = pd.DataFrame({
+        'Genre': rng.choice(["Male", "Female"], n), 'Age': rng.integers(18, 70, n),
+        'Annual Income (k$)': X[:, 0].round(1), 'Spending Score (1-100)': X[:, 1].round(1),
+    })
+    if path.suffix == '.parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+def clock(f, repeat=5):
+    # median wall time in seconds
+    ts = []
+    for _ in range(repeat):
+        t = time.perf_counter(); f(); ts.append(time.perf_counter() - t)
+    return float(np.median(ts))
+
+
+def per_call(f, calls=2000):
+    t = time.perf_counter()
+    for _ in range(calls):
+        f()
+    return (time.perf_counter() - t) / calls
+
+
+# ── one size, in its own process ──────────────────────────────
+def measure(n, tmp):
+    import logging
+    import runpy
+
+    import plotly.io as pio
+
+    import segmentation
+    from export import export_file
+    from explorer import build_index, filter_index
+    from ingest import INC_RANGE, SPD_RANGE
+    from training import AUTO_ROWS, train, train_config
+
+    path = write_customers(n, Path(tmp) / DATA_FILE)
+    out  = {}
+    t = time.perf_counter(); segmentation.build(str(path))
+    out['load_cold'] = time.perf_counter() - t
+    out['load_warm'] = clock(lambda: segmentation.build(str(path)), repeat=3)
+
+    # the in-memory route with no SEGMENTIQ_DATA: the 200-row demo build, and
+    # the same full-batch KMeans(n_init=15) fit on n rows of blobs
+    t = time.perf_counter(); segmentation.build(None)
+    out['synthetic_cold'] = time.perf_counter() - t
+    out['synthetic_warm'] = clock(lambda: segmentation.build(None), repeat=3)
+    if n <= AUTO_ROWS:
+        X = blobs(n, 1)
+        out['fit_full'] = clock(lambda: train(X, train_config(segmentation.KMEANS_PARAMS, n, mode="full")), repeat=1)
+
+    # the app's own functions, from a bare-mode run of the Overview page
+    logging.disable(logging.WARNING)
+    g = runpy.run_path(str(ROOT / "app.py"), run_name="__main__")
+    logging.disable(logging.NOTSET)
+    v, df, meta = g['model_version'], g['df'], g['meta']
+
+    out['classify_grid']    = per_call(lambda: g['classify'](65, 50))
+    out['classify_offgrid'] = per_call(lambda: g['classify'](65.5, 50.5), calls=500)
+
+    def raster(step):
+        g['boundary_raster'].clear()
+        g['boundary_raster'](v, step)
+    out['boundary_grid_step1'] = clock(lambda: raster(1))
+    out['boundary_grid_step4'] = clock(lambda: raster(4))
+    out['sweeps'] = clock(lambda: (g['segment_breakpoints'](0, 50, *INC_RANGE),
+                                   g['segment_breakpoints'](1, 65, *SPD_RANGE)), repeat=50)
+    scen = ([65, 75, 85, 55, 65, 65, 90], [50, 50, 50, 50, 70, 30, 75])
+    out['proximity_map'] = clock(lambda: (raster(4), g['classify_many'](*scen)))
+
+    def scatter_cold():
+        g['cluster_sample'].clear()
+        return g['scatter'](None, None, 360)
+    out['scatter_build'] = clock(scatter_cold, repeat=3)
+    fig = g['scatter'](None, None, 360)
+    out['scatter_serialize'] = clock(lambda: pio.to_json(fig, validate=False), repeat=3)
+
+    ix = None
+    def index():
+        nonlocal ix
+        ix = build_index(df, len(meta))
+    out['explorer_index'] = clock(index, repeat=1)
+    out['explorer_filter'] = clock(lambda: filter_index(ix, *QUERY))
+    idx = filter_index(ix, *QUERY)
+    for fmt in ('CSV', 'Parquet'):
+        d = Path(tempfile.mkdtemp(dir=tmp))
+        out[f'export_{fmt.lower()}'] = clock(lambda: export_file(df, idx, meta, fmt, (v, fmt), root=d), repeat=1)
+    return {'rows': n, 'filtered_rows': int(len(idx)), 'seconds': out}
+
+
+def run_size(n):
+    with tempfile.TemporaryDirectory() as tmp:
+        # the app reads SEGMENTIQ_DATA at import; measure() writes that file first
+        env  = dict(os.environ, SEGMENTIQ_ARTIFACTS=tmp, SEGMENTIQ_DATA=str(Path(tmp) / DATA_FILE))
+        code = (f"import sys, json; sys.path.insert(0, {str(ROOT / 'benchmarks')!r}); "
+                f"import bench_suite; print(json.dumps(bench_suite.measure({n}, {tmp!r})))")
+        res = subprocess.run([sys.executable, "-c", code], env=env, cwd=ROOT,
+                             capture_output=True, text=True)
+        if res.returncode:
+            raise RuntimeError(f"{n:,} rows failed:\n{res.stderr[-2000:]}")
+        return json.loads(res.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, tolerance):
+    base = {r['rows']: r['seconds'] for r in baseline['results']}
+    regressions = []
+    for r in results:
+        b = base.get(r['rows'])
+        if b is None:
+            continue
+        print(f"\n{r['rows']:,} rows vs baseline")
+        for name, s in r['seconds'].items():
+            if name not in b:
+                continue
+            ratio = s / max(b[name], 1e-9)
+            flag  = "  REGRESSION" if ratio > tolerance else ""
+            print(f"  {name:<22} {b[name]*1000:>10.3f} → {s*1000:>10.3f} ms  {ratio:>5.2f}x{flag}")
+            if flag:
+                regressions.append((r['rows'], name, ratio))
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--rows', type=int, nargs='+', default=SIZES)
+    ap.add_argument('--out', help="write results as JSON")
+    ap.add_argument('--baseline', help="JSON from an earlier run to compare against")
+    ap.add_argument('--tolerance', type=float, default=1.25, help="slowdown ratio that counts as a regression")
+    args = ap.parse_args()
+
+    results = []
+    for n in args.rows:
+        r = run_size(n)
+        results.append(r)
+        print(f"{n:,} rows")
+        for name, s in r['seconds'].items():
+            print(f"  {name:<22} {s*1000:>12.3f} ms")
+    doc = {
+        'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count(),
+        'numpy': np.__version__, 'pandas': pd.__version__, 'results': results,
+    }
+    if args.out:
+        Path(args.out).write_text(json.dumps(doc, indent=2))
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.tolerance:.2f}x", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# Full-batch vs mini-batch training: wall time, peak traced memory, inertia.
+#   python benchmarks/bench_training.py --rows 1000000 10000000
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from training import BATCH_SIZE, EPOCHS, inertia, iter_batches, train, train_config  # noqa: E402
+
+PARAMS = dict(n_clusters=5, random_state=42, n_init=15)
+
+
+def blobs(n, seed=42):
+    # the app's five synthetic income/spending groups, scaled up to n rows
+    rng = np.random.default_rng(seed)
+    mu  = np.array([[25, 20], [25, 75], [55, 50], [85, 80], [85, 20]], dtype=float)
+    sd  = np.array([[8, 10], [8, 10], [10, 10], [10, 10], [10, 10]], dtype=float)
+    k   = rng.integers(0, 5, n)
+    X   = mu[k] + rng.standard_normal((n, 2)) * sd[k]
+    return np.clip(X, [15, 1], [137, 100])
+
+
+def run(X, mode, batch_size, epochs):
+    cfg = train_config(PARAMS, len(X), mode=mode, batch_size=batch_size, epochs=epochs)
+    tracemalloc.start()
+    t = time.perf_counter()
+    km, sc, report = train(X, cfg)
+    wall = time.perf_counter() - t
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'mode': mode, 'rows': len(X), 'wall_s': wall, 'peak_mb': peak / 2**20,
+        'inertia': inertia(km, sc, lambda: iter_batches(X, 1_000_000)),
+        'epochs_s': report.get('epochs_s', []),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    ap.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    ap.add_argument('--epochs', type=int, default=EPOCHS)
+    args = ap.parse_args()
+
+    print(f"{'rows':>11} {'mode':>10} {'wall s':>9} {'peak MB':>9} {'inertia':>14}  epochs s")
+    for n in args.rows:
+        X = blobs(n)
+        for mode in ('full', 'minibatch'):
+            r = run(X, mode, args.batch_size, args.epochs)
+            ep = ' '.join(f"{e:.2f}" for e in r['epochs_s']) or '-'
+            print(f"{n:>11,} {mode:>10} {r['wall_s']:>9.2f} {r['peak_mb']:>9.1f} {r['inertia']:>14.1f}  {ep}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+import numpy as np
+
+from ingest import AGE_RANGE, INC_RANGE, SPD_RANGE
+
+RANGES = {'Income': INC_RANGE, 'Spending': SPD_RANGE, 'Age': AGE_RANGE}
+
+
+# at most `bins` equal-width bins on half-integer edges covering the column's
+# valid range, so a column bins the same way whatever rows a chart shows
+def fixed_edges(col, bins):
+    lo, hi = RANGES[col]
+    span = hi - lo + 1
+    w = -(-span // bins)
+    return lo - 0.5 + w * np.arange(-(-span // w) + 1, dtype=np.float64)
+
+
+def bin_counts(values, edges):
+    w = edges[1] - edges[0]
+    b = ((np.asarray(values, dtype=np.float64) - edges[0]) // w).astype(np.intp)
+    return np.bincount(np.clip(b, 0, len(edges) - 2), minlength=len(edges) - 1)
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+SORTS = {
+    "Income ↓":   ("Income",   False),
+    "Income ↑":   ("Income",   True),
+    "Spending ↓": ("Spending", False),
+    "Spending ↑": ("Spending", True),
+    "Age ↓":      ("Age",      False),
+    "Age ↑":      ("Age",      True),
+}
+PAGE_SIZES = [50, 100, 250, 500]
+SMALL = 16          # results under n/SMALL rows are rank-sorted instead of gathered
+INDEX_VERSION = 1   # bump when build_index's layout changes; shared copies are keyed on it
+
+
+def _freeze(a):
+    a.flags.writeable = False
+    return a
+
+
+# built once per model version: packed row bitmaps per cluster and gender, an
+# age-sorted permutation, and the ascending order + rank of every sort column
+def build_index(df, k):
+    n    = len(df)
+    it   = np.int32 if n < 2**31 else np.int64
+    cl   = df['Cluster'].to_numpy()
+    gen  = df['Gender']
+    age  = df['Age'].to_numpy()
+    perm = np.argsort(age, kind='stable').astype(it)
+    ix = {
+        'n': n,
+        'cluster': [_freeze(np.packbits(cl == i)) for i in range(k)],
+        'gender':  {g: _freeze(np.packbits((gen == g).to_numpy())) for g in ('Male', 'Female')},
+        'age_perm': _freeze(perm), 'age_sorted': _freeze(age[perm]),
+        'order': {}, 'rank': {},
+    }
+    for col in {c for c, _ in SORTS.values()}:
+        o = np.argsort(df[col].to_numpy(), kind='stable').astype(it)
+        r = np.empty(n, dtype=it); r[o] = np.arange(n, dtype=it)
+        ix['order'][col], ix['rank'][col] = _freeze(o), _freeze(r)
+    return ix
+
+
+def _any(maps, nbytes):
+    out = np.zeros(nbytes, dtype=np.uint8)
+    for b in maps:
+        out |= b
+    return out
+
+
+# row positions of the filtered, sorted result; pages are slices of this
+def filter_index(ix, seg_f, gen_f, age_r, sort_b):
+    n    = ix['n']
+    nb   = (n + 7) // 8
+    bits = _any([ix['cluster'][i] for i in seg_f], nb) & _any([ix['gender'][g] for g in gen_f if g in ix['gender']], nb)
+    sel  = np.unpackbits(bits, count=n).view(bool)
+    a    = ix['age_sorted']
+    lo, hi = np.searchsorted(a, age_r[0], 'left'), np.searchsorted(a, age_r[1], 'right')
+    if hi - lo < n:
+        in_age = np.zeros(n, dtype=bool); in_age[ix['age_perm'][lo:hi]] = True
+        sel &= in_age
+    col, asc = SORTS[sort_b]
+    if sel.sum() * SMALL < n:
+        pos = np.flatnonzero(sel)
+        out = pos[np.argsort(ix['rank'][col][pos], kind='stable')]
+    else:
+        o   = ix['order'][col]
+        out = o[sel[o]]
+    return out if asc else out[::-1]
+
+
+# cluster codes → categorical labels without materialising a string per row
+def segment_labels(codes, meta, field='name'):
+    return pd.Categorical.from_codes(codes, categories=[m[field] for m in meta])
+
+
+def page_frame(df, idx, page, size, meta):
+    start = page * size
+    sl    = idx[start:start+size]
+    out   = df.iloc[sl][['Income','Spending','Age','Gender','Cluster']].reset_index(drop=True)
+    cl    = out['Cluster'].to_numpy()
+    out.insert(0, '#', np.arange(start+1, start+len(sl)+1))
+    out['Segment'] = segment_labels(cl, meta, 'short')
+    out['Action']  = segment_labels(cl, meta, 'strategy')
+    return out
@@ -0,0 +1,95 @@
+import hashlib
+import io
+import os
+import tempfile
+from pathlib import Path
+
+from explorer import segment_labels
+from store import ARTIFACT_DIR
+
+EXPORT_DIR  = Path(os.environ.get("SEGMENTIQ_EXPORTS", ARTIFACT_DIR / "exports"))
+EXPORT_ROWS = 250_000
+KEEP_FILES  = 32
+COLUMNS     = ['Income', 'Spending', 'Age', 'Gender', 'Segment', 'Cluster']
+FORMATS = {
+    'CSV':       ('csv',     'text/csv'),
+    'Parquet':   ('parquet', 'application/vnd.apache.parquet'),
+    'Arrow IPC': ('arrow',   'application/vnd.apache.arrow.file'),
+}
+
+
+def iter_export(df, idx, meta, chunk=EXPORT_ROWS):
+    # an empty filter still yields one empty, correctly typed frame
+    for i in range(0, max(len(idx), 1), chunk):
+        part = df.iloc[idx[i:i+chunk]][['Income', 'Spending', 'Age', 'Gender', 'Cluster']].reset_index(drop=True)
+        part['Segment'] = segment_labels(part['Cluster'].to_numpy(), meta)
+        yield part[COLUMNS]
+
+
+# path=None builds the file in memory and returns its bytes
+def _write(frames, path, fmt):
+    if fmt == 'CSV':
+        buf   = io.BytesIO() if path is None else None
+        first = True
+        for part in frames:
+            if buf is None:
+                part.to_csv(path, mode='w' if first else 'a', header=first, index=False)
+            else:
+                buf.write(part.to_csv(header=first, index=False).encode())
+            first = False
+        return None if buf is None else buf.getvalue()
+    import pyarrow as pa
+    sink   = pa.BufferOutputStream() if path is None else str(path)
+    writer = None
+    try:
+        for part in frames:
+            t = pa.Table.from_pandas(part, preserve_index=False)
+            if writer is None:
+                if fmt == 'Parquet':
+                    import pyarrow.parquet as pq
+                    writer = pq.ParquetWriter(sink, t.schema)
+                else:
+                    writer = pa.ipc.new_file(sink, t.schema)
+            writer.write_table(t)
+    finally:
+        if writer is not None:
+            writer.close()
+    return sink.getvalue().to_pybytes() if path is None else None
+
+
+def _prune(root, keep=KEEP_FILES):
+    files = sorted((p for p in root.glob("export-*") if p.suffix != '.tmp'), key=lambda p: p.stat().st_mtime, reverse=True)
+    for p in files[keep:]:
+        p.unlink(missing_ok=True)
+
+
+# streams the filtered rows to disk chunk by chunk; the same filter state
+# and format reuse the file instead of rebuilding it
+def export_file(df, idx, meta, fmt, key, root=EXPORT_DIR):
+    ext  = FORMATS[fmt][0]
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    path = root / f"export-{hashlib.sha1(repr(key).encode()).hexdigest()[:16]}.{ext}"
+    if not path.exists():
+        # sessions are threads of one process: each build gets its own temp file
+        fd, tmp = tempfile.mkstemp(dir=root, prefix=f".{path.stem}-", suffix=".tmp")
+        os.close(fd)
+        try:
+            _write(iter_export(df, idx, meta), tmp, fmt)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        _prune(root)
+    else:
+        path.touch()
+    return path
+
+
+# the download button's bytes: from the reused file, or built in memory from
+# the same chunks when the export directory can't be written (read-only volume)
+def export_bytes(df, idx, meta, fmt, key, root=EXPORT_DIR):
+    try:
+        return export_file(df, idx, meta, fmt, key, root).read_bytes()
+    except OSError:
+        return _write(iter_export(df, idx, meta), None, fmt)
@@ -0,0 +1,148 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from store import file_digest, key_for, load_artifacts, save_artifacts
+from training import AUTO_ROWS, BATCH_SIZE, EPOCHS, TRAIN_MODE, fit_full, fit_minibatch, train_config
+
+INC_RANGE = (15, 137)
+SPD_RANGE = (1, 100)
+AGE_RANGE = (18, 80)
+CHUNK_ROWS = 500_000
+
+# Mall_Customers.csv headers (and the notebook's 'Genre') → app columns
+COLUMNS = {
+    'Annual Income (k$)':     'Income',
+    'Spending Score (1-100)': 'Spending',
+    'Genre':                  'Gender',
+    'Gender':                 'Gender',
+    'Age':                    'Age',
+    'Income':                 'Income',
+    'Spending':               'Spending',
+}
+REQUIRED = ['Income', 'Spending', 'Age', 'Gender']
+GENDERS  = {'male': 'Male', 'm': 'Male', 'female': 'Female', 'f': 'Female'}
+GENDER_CATS = ['Male', 'Female']
+
+
+def iter_raw(path, chunksize=CHUNK_ROWS, all_columns=False, text=False):
+    path = Path(path)
+    keep = (lambda c: True) if all_columns else (lambda c: c.strip() in COLUMNS)
+    if path.suffix.lower() in ('.parquet', '.pq'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet needs pyarrow: pip install pyarrow") from e
+        pf   = pq.ParquetFile(path)
+        cols = [c for c in pf.schema_arrow.names if keep(c)]
+        for batch in pf.iter_batches(batch_size=chunksize, columns=cols):
+            yield batch.to_pandas()
+    else:
+        # text=True reads every CSV column as str, so a column's dtype can't
+        # change from one chunk to the next
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=keep, dtype=str if text else None)
+
+
+def clean(chunk):
+    chunk = chunk.rename(columns=lambda c: COLUMNS[c.strip()])
+    chunk = chunk.loc[:, ~chunk.columns.duplicated()]
+    missing = [c for c in REQUIRED if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"missing required columns: {', '.join(missing)}")
+    out = pd.DataFrame({
+        'Income':   pd.to_numeric(chunk['Income'],   errors='coerce').clip(*INC_RANGE),
+        'Spending': pd.to_numeric(chunk['Spending'], errors='coerce').clip(*SPD_RANGE),
+        'Age':      pd.to_numeric(chunk['Age'],      errors='coerce').clip(*AGE_RANGE),
+        'Gender':   chunk['Gender'].astype(str).str.strip().str.lower().map(GENDERS),
+    })
+    ok = out.notna().all(axis=1)
+    out = out[ok]
+    out['Age'] = out['Age'].round().astype(np.int64)
+    return out.reset_index(drop=True), int((~ok).sum())
+
+
+def iter_clean(path, chunksize=CHUNK_ROWS):
+    for raw in iter_raw(path, chunksize):
+        yield clean(raw)
+
+
+def scan(path, chunksize=CHUNK_ROWS):
+    # one bounded-memory pass: feature moments (merged per chunk like
+    # StandardScaler.partial_fit, but without importing sklearn) and row counts
+    mean = np.zeros(2); m2 = np.zeros(2)
+    n = rejected = 0
+    for chunk, bad in iter_clean(path, chunksize):
+        rejected += bad
+        if chunk.empty:
+            continue
+        X  = chunk[['Income', 'Spending']].to_numpy(np.float64)
+        k  = len(X)
+        mu = X.mean(axis=0)
+        d  = mu - mean
+        m2 += ((X - mu)**2).sum(axis=0) + d**2 * n * k / (n + k)
+        mean += d * k / (n + k)
+        n += k
+    if n == 0:
+        raise ValueError(f"no valid rows in {path}")
+    return (mean, m2 / n), n, rejected
+
+
+def standard_scaler(mean, var, n):
+    # a fitted StandardScaler from scan()'s moments, so a fit skips a pass
+    from sklearn.preprocessing import StandardScaler
+    sc = StandardScaler()
+    sc.mean_, sc.var_ = mean, var
+    sc.scale_ = np.where(var > 0, np.sqrt(var), 1.0)
+    sc.n_samples_seen_, sc.n_features_in_ = n, len(mean)
+    return sc
+
+
+def iter_X(path, chunksize=CHUNK_ROWS):
+    for chunk, _ in iter_clean(path, chunksize):
+        yield chunk[['Income', 'Spending']].to_numpy(np.float64)
+
+
+# keyed on the file's identity and the requested settings, so a warm start
+# never parses the file; on a miss scan() counts the valid rows and the mode
+# follows train_config() like in-memory data: files up to AUTO_ROWS are loaded
+# and fitted full-batch, larger ones trained out-of-core with the scaler
+# scan() already streamed
+def load_or_fit_file(path, params, chunksize=CHUNK_ROWS, mode=TRAIN_MODE, batch_size=BATCH_SIZE, epochs=EPOCHS):
+    key = key_for(file_digest(path), dict(params, mode=mode, auto_rows=AUTO_ROWS, batch_size=batch_size,
+                                          epochs=epochs, source='file'))
+    hit = load_artifacts(key, lite=True)
+    if hit is not None:
+        return (*hit, key)
+    moments, n, _ = scan(path, chunksize)
+    cfg = dict(train_config(params, n, mode, batch_size, epochs), source='file', rows=n)
+    if cfg['mode'] == 'full':
+        km, sc, report = fit_full(np.concatenate(list(iter_X(path, chunksize))), cfg)
+    else:
+        km, sc, report = fit_minibatch(lambda: iter_X(path, chunksize), cfg, sc=standard_scaler(*moments, n))
+    save_artifacts(key, km, sc, cfg, report=report)
+    return km, sc, key
+
+
+def read_customers(path, km, sc, chunksize=CHUNK_ROWS):
+    parts = []
+    for chunk, _ in iter_clean(path, chunksize):
+        chunk['Cluster'] = km.predict(sc.transform(chunk[['Income', 'Spending']].to_numpy(np.float64)))
+        parts.append(compact(chunk))
+    return pd.concat(parts, ignore_index=True)
+
+
+# in-memory schema: 8 bytes/row instead of ~45 with float64/int64/object
+# columns; spending scores are whole numbers on the 1–100 scale. Shared
+# datasets are keyed on SCHEMA_VERSION: bump it whenever this changes
+SCHEMA_VERSION = 1
+
+
+def compact(df):
+    return pd.DataFrame({
+        'Income':   df['Income'].round(1).astype(np.float32),
+        'Spending': df['Spending'].round().clip(*SPD_RANGE).astype(np.uint8),
+        'Age':      df['Age'].astype(np.uint8),
+        'Gender':   pd.Categorical(df['Gender'], categories=GENDER_CATS),
+        'Cluster':  df['Cluster'].astype(np.int8),
+    })
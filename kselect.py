@@ -0,0 +1,94 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from store import ARTIFACT_DIR, artifact_key, key_for
+from training import iter_batches, train, train_config
+
+K_RANGE      = range(2, 12)
+EXACT_ROWS   = 10_000      # exact O(n²) silhouette up to here, sampled above
+SAMPLE_ROWS  = 10_000
+POOL_ROWS    = 50_000      # below this a process pool costs more than it saves
+FIT_ROWS     = 200_000     # above this every k is fitted and scored on a uniform sample
+WORKING_MB   = 64          # silhouette distance chunks; sklearn's 1 GB default peaks at ~760 MB
+WORKERS      = int(os.environ.get("SEGMENTIQ_KSELECT_WORKERS", os.cpu_count() or 1))
+
+_X = None
+
+
+def _init(X):
+    global _X
+    _X = X
+
+
+def simplified_silhouette(Xs, km, batch=1_000_000):
+    # centroid-based silhouette: a = distance to own centre, b = to the next
+    # nearest one; O(n·k) and streamable, so it scales to any n
+    total = 0.0
+    for B in iter_batches(Xs, batch):
+        d = np.sort(km.transform(B), axis=1)
+        a, b = d[:, 0], d[:, 1]
+        total += np.nan_to_num((b - a) / np.maximum(a, b)).sum()
+    return total / len(Xs)
+
+
+def score_k(k, params, X=None):
+    from sklearn import config_context
+    from sklearn.metrics import silhouette_score
+    X   = _X if X is None else X
+    km, sc, _ = train(X, train_config(dict(params, n_clusters=k), len(X)))
+    Xs  = sc.transform(X)
+    lab = km.predict(Xs)
+    with config_context(working_memory=WORKING_MB):
+        if len(X) <= EXACT_ROWS:
+            sil, method = silhouette_score(Xs, lab), 'exact'
+        else:
+            sil, method = silhouette_score(Xs, lab, sample_size=SAMPLE_ROWS, random_state=params.get('random_state')), 'sampled'
+    return {
+        'k': k, 'inertia': float(-km.score(Xs)), 'silhouette': float(sil), 'method': method,
+        'simplified': float(simplified_silhouette(Xs, km)),
+    }
+
+
+# Income/Spending as float64 for at most FIT_ROWS rows, read straight from the
+# (shared, compact) frame so a large one is never copied whole at 16 B/row
+def features(df, size=FIT_ROWS, seed=None):
+    n = len(df)
+    if n <= size:
+        return df[['Income', 'Spending']].to_numpy(np.float64), n
+    pos = np.sort(np.random.default_rng(seed).choice(n, size, replace=False))
+    return np.column_stack([df['Income'].to_numpy()[pos], df['Spending'].to_numpy()[pos]]).astype(np.float64), n
+
+
+# X may be a sample of `rows` rows (see features); inertia is then scaled up to
+# the whole set. With `key` (the shared dataset's) the result is cached under
+# it rather than under a hash of X
+def select_k(X, params, k_range=K_RANGE, workers=WORKERS, root=ARTIFACT_DIR, key=None, rows=None):
+    ks   = list(k_range)
+    meta = dict(params, k_range=ks, fit_rows=len(X))
+    path = Path(root) / f"kselect-{key_for(key, meta) if key else artifact_key(X, meta)}.json"
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        pass
+    if workers > 1 and len(X) >= POOL_ROWS:
+        # spawn, not fork: the Streamlit server is multi-threaded
+        with ProcessPoolExecutor(max_workers=min(workers, len(ks)), initializer=_init, initargs=(X,),
+                                 mp_context=multiprocessing.get_context("spawn")) as ex:
+            out = list(ex.map(score_k, ks, [params]*len(ks)))
+    else:
+        out = [score_k(k, params, X) for k in ks]
+    if rows and rows != len(X):
+        for r in out:
+            r['inertia'] *= rows / len(X)
+            r['fit_rows'] = len(X)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(out, indent=2))
+    except OSError:
+        pass
+    return out
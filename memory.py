@@ -0,0 +1,105 @@
+import json
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+from collections import defaultdict, deque
+
+import numpy as np
+
+log = logging.getLogger("segmentiq.memory")
+
+KEEP = 500        # runs kept per page
+
+_lock  = threading.Lock()
+_runs  = defaultdict(lambda: deque(maxlen=KEEP))
+_local = threading.local()
+
+# tracing slows every allocation in the worker for as long as it runs, so it
+# is only ever switched on for the whole process, with SEGMENTIQ_TRACEMALLOC=1
+if os.environ.get("SEGMENTIQ_TRACEMALLOC") == "1":
+    tracemalloc.start()
+
+
+# ── PER RUN ───────────────────────────────────────────────────
+# traced memory is process-wide: a run's figures include whatever other
+# sessions allocated meanwhile, so they are exact only with one session
+def start():
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        _local.base = tracemalloc.get_traced_memory()[0]
+    else:
+        _local.base = None
+
+
+# retained = still allocated at the end of the run (cache fills, leaks);
+# peak = the run's high-water mark over where it started
+def finish(page):
+    base = getattr(_local, 'base', None)
+    if base is None or not tracemalloc.is_tracing():
+        return None
+    cur, peak = tracemalloc.get_traced_memory()
+    rec = {'page': page, 'retained': cur - base, 'peak': peak - base}
+    with _lock:
+        _runs[page].append(rec)
+    log.info(json.dumps({'event': 'page', **rec}))
+    return rec
+
+
+def summary():
+    with _lock:
+        runs = {k: list(v) for k, v in _runs.items()}
+    return {k: {'runs': len(v), 'last': v[-1],
+                'retained_p50': int(np.median([r['retained'] for r in v])),
+                'peak_p50': int(np.median([r['peak'] for r in v])), 'peak_max': max(r['peak'] for r in v)}
+            for k, v in runs.items() if v}
+
+
+# ── RESIDENT OBJECTS ──────────────────────────────────────────
+# deep size in bytes; anything already in `seen` counts once, for whoever
+# reached it first, and array views count their base
+def sizeof(obj, seen=None):
+    seen = set() if seen is None else seen
+    if isinstance(obj, np.ndarray):
+        while isinstance(obj.base, np.ndarray):
+            obj = obj.base
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if hasattr(obj, 'memory_usage'):                  # DataFrame, Series, Index
+        return int(np.sum(obj.memory_usage(deep=True)))
+    if hasattr(obj, 'to_plotly_json'):
+        return sizeof(obj.to_plotly_json(), seen)
+    n = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return n + sum(sizeof(k, seen) + sizeof(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return n + sum(sizeof(v, seen) for v in obj)
+    if hasattr(obj, '__dict__') and not isinstance(obj, type):
+        return n + sizeof(vars(obj), seen)
+    return n
+
+
+# the named objects first, then every process-wide st.cache_resource function
+# with its entry count and whatever its entries hold beyond what came before.
+# The caches are Streamlit privates; if a release moves them, only the named
+# objects are reported
+def footprint(named):
+    seen = set()
+    out  = {name: {'entries': 1, 'bytes': sizeof(obj, seen)} for name, obj in named.items()}
+    try:
+        from streamlit.runtime.caching.cache_resource_api import _resource_caches
+        with _resource_caches._caches_lock:
+            caches = list(_resource_caches._function_caches.get(None, {}).values())
+        entries = []
+        for c in sorted(caches, key=lambda c: c.display_name):
+            with c._mem_cache_lock:
+                entries.append((c.display_name.rsplit('.', 1)[-1], [r.value for r in c._mem_cache.values()]))
+    except (ImportError, AttributeError, TypeError):
+        return out
+    for name, values in entries:
+        out[name] = {'entries': len(values), 'bytes': sum(sizeof(v, seen) for v in values)}
+    return out
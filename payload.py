@@ -0,0 +1,94 @@
+import logging
+import threading
+from collections import defaultdict, deque
+
+import numpy as np
+
+log = logging.getLogger("segmentiq.payload")
+
+KEEP  = 500       # reruns kept per page
+SMALL = 64        # float arrays up to this size are sent as short rounded JSON lists
+
+_lock = threading.Lock()
+_runs = defaultdict(lambda: deque(maxlen=KEEP))
+
+
+# ── BYTES SENT ────────────────────────────────────────────────
+# counts the serialised size of every message the session's script thread
+# enqueues; mark()/record() pairs can nest, so a fragment rerun and the full
+# run that first drew it are measured independently
+class _Meter:
+    def __init__(self, enqueue):
+        self.enqueue, self.total = enqueue, 0
+
+    def __call__(self, msg):
+        self.total += msg.ByteSize()
+        self.enqueue(msg)
+
+
+# wraps ScriptRunContext._enqueue, a Streamlit private: if a release renames
+# it, the meter reports nothing rather than breaking every page
+def _meter():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    enqueue = getattr(ctx, '_enqueue', None)
+    if not callable(enqueue):
+        return None
+    if not isinstance(enqueue, _Meter):
+        try:
+            ctx._enqueue = enqueue = _Meter(enqueue)
+        except (AttributeError, TypeError):
+            return None
+    return enqueue
+
+
+def mark():
+    m = _meter()
+    return m.total if m else None
+
+
+# fragment=True records only when the fragment reran on its own, not when the
+# full run drew it
+def record(key, since, fragment=False):
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    m = _meter()
+    if m is None or since is None or (fragment and not getattr(get_script_run_ctx(), 'fragment_ids_this_run', None)):
+        return
+    n = m.total - since
+    with _lock:
+        _runs[key].append(n)
+    log.debug("%s rerun sent %d bytes", key, n)
+
+
+def summary():
+    with _lock:
+        runs = {k: list(v) for k, v in _runs.items()}
+    return {k: {'reruns': len(v), 'last': v[-1], 'median': int(np.median(v)), 'max': max(v)}
+            for k, v in runs.items() if v}
+
+
+# ── FIGURE TRIM ───────────────────────────────────────────────
+_ARRAYS = ('x', 'y', 'z', 'r', 'width')
+
+
+def _compact(v, digits):
+    a = np.asarray(v)
+    if a.dtype.kind == 'f':
+        a = np.round(a, digits)
+        return a.astype(np.float32) if a.size > SMALL else a.tolist()
+    if a.dtype.kind in 'iu' and a.dtype.itemsize > 4 and a.size and np.abs(a).max() < 2**31:
+        return a.astype(np.int32)
+    return v
+
+
+# rounds float data and narrows dtypes in place: Plotly ships numpy arrays as
+# base64 typed arrays (so float32 halves them) and lists as JSON text (so
+# rounding shortens them)
+def compact_figure(fig, digits=2):
+    for t in fig.data:
+        for name in _ARRAYS:
+            if name in t and t[name] is not None:
+                t[name] = _compact(t[name], digits)
+        if 'error_y' in t and t.error_y.array is not None:
+            t.error_y.array = _compact(t.error_y.array, digits)
+    return fig
@@ -0,0 +1,44 @@
+import os
+
+import numpy as np
+
+GL_ROWS     = int(os.environ.get("SEGMENTIQ_GL_ROWS", 5_000))      # WebGL markers above this many points
+DRAW_ROWS   = int(os.environ.get("SEGMENTIQ_DRAW_ROWS", 50_000))   # stratified sample above this many
+MIN_STRATUM = 500                                                  # small clusters keep at least this many
+
+
+def _priority(pos):
+    # splitmix64 of the row position: a fixed pseudo-random key per row, so the
+    # same rows are drawn on every rerun and under every filter that keeps them
+    z = pos.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+# `groups` holds row positions per cluster; each keeps its share of `budget`
+# (bottom-k by row priority), returned in row order
+def stratified_sample(groups, budget=DRAW_ROWS):
+    total = sum(len(g) for g in groups)
+    if total <= budget:
+        return list(groups)
+    out = []
+    for g in groups:
+        m = max(min(len(g), MIN_STRATUM), round(budget * len(g) / total))
+        if m >= len(g):
+            out.append(g)
+            continue
+        keep = np.argpartition(_priority(g), m)[:m]
+        out.append(np.sort(g[keep]))
+    return out
+
+
+def split_by_cluster(idx, cl, k):
+    c = cl[idx]
+    return [idx[c == i] for i in range(k)]
+
+
+def drawn_note(represented, drawn):
+    if drawn >= represented:
+        return None
+    return f"{drawn:,} of {represented:,} points drawn · stratified sample"
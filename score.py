@@ -0,0 +1,123 @@
+# Headless batch scoring with the same persisted model the app serves.
+#   python score.py customers.csv scored.parquet --workers 8
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ingest import CHUNK_ROWS, COLUMNS, INC_RANGE, SPD_RANGE, iter_raw
+from segmentation import DATA_PATH, META, load_model, nearest_centroid
+
+NAMES = np.array([m['name'] for m in META] + [''], dtype=object)
+
+
+def _score(centres, mean, scale, inc, spd):
+    out = np.full(len(inc), -1, dtype=np.int8)
+    ok  = ~(np.isnan(inc) | np.isnan(spd))
+    out[ok] = nearest_centroid(centres, mean, scale, inc[ok], spd[ok])
+    return out
+
+
+def _features(chunk):
+    src = {COLUMNS[c.strip()]: c for c in chunk.columns if c.strip() in COLUMNS}
+    missing = [c for c in ('Income', 'Spending') if c not in src]
+    if missing:
+        raise ValueError(f"missing required columns: {', '.join(missing)}")
+    inc = pd.to_numeric(chunk[src['Income']],   errors='coerce').clip(*INC_RANGE).to_numpy(np.float64)
+    spd = pd.to_numeric(chunk[src['Spending']], errors='coerce').clip(*SPD_RANGE).to_numpy(np.float64)
+    return inc, spd
+
+
+# writes to a temp file next to the destination and renames it into place on
+# success, so a failed run never leaves a truncated output behind
+class Writer:
+    def __init__(self, path):
+        self.path, self.pq, self.first = Path(path), None, True
+        self.tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+
+    def write(self, chunk):
+        if self.path.suffix.lower() in ('.parquet', '.pq'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self.pq is None:
+                # an all-blank column in the first chunk infers as null; write it as text
+                schema  = pa.schema([f.with_type(pa.string()) if pa.types.is_null(f.type) else f
+                                     for f in table.schema])
+                self.pq = pq.ParquetWriter(self.tmp, schema)
+            self.pq.write_table(table.cast(self.pq.schema))
+        else:
+            chunk.to_csv(self.tmp, mode='w' if self.first else 'a', header=self.first, index=False)
+        self.first = False
+
+    def close(self, ok=True):
+        if self.pq is not None:
+            self.pq.close()
+        if ok:
+            os.replace(self.tmp, self.path)
+        else:
+            self.tmp.unlink(missing_ok=True)
+
+
+def score_file(src, dst, chunksize=CHUNK_ROWS, workers=1, data=DATA_PATH, progress=None):
+    km, sc, _ = load_model(data)
+    model  = (km.cluster_centers_, sc.mean_, sc.scale_)
+    out    = Writer(dst)
+    t, n   = time.perf_counter(), 0
+
+    def emit(chunk, labels):
+        nonlocal n
+        chunk['Cluster'] = labels
+        chunk['Segment'] = NAMES[labels]
+        out.write(chunk)
+        n += len(chunk)
+        if progress:
+            progress(n, time.perf_counter() - t)
+
+    ok = False
+    try:
+        if workers <= 1:
+            for chunk in iter_raw(src, chunksize, all_columns=True, text=True):
+                emit(chunk, _score(*model, *_features(chunk)))
+        else:
+            # bounded window of in-flight chunks keeps memory flat and output ordered
+            pending = deque()
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as ex:
+                for chunk in iter_raw(src, chunksize, all_columns=True, text=True):
+                    pending.append((chunk, ex.submit(_score, *model, *_features(chunk))))
+                    if len(pending) >= 2 * workers:
+                        c, f = pending.popleft(); emit(c, f.result())
+                while pending:
+                    c, f = pending.popleft(); emit(c, f.result())
+        ok = True
+    finally:
+        out.close(ok)
+    return n, time.perf_counter() - t
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Label customers with SegmentIQ segments.")
+    ap.add_argument('input',  help="CSV or Parquet file with income and spending columns")
+    ap.add_argument('output', help="CSV or Parquet destination (by extension)")
+    ap.add_argument('--chunksize', type=int, default=CHUNK_ROWS)
+    ap.add_argument('--workers',   type=int, default=os.cpu_count() or 1)
+    ap.add_argument('--data', default=DATA_PATH,
+                    help="training file of the model to use (default: SEGMENTIQ_DATA, else the synthetic demo model)")
+    args = ap.parse_args(argv)
+
+    def progress(n, s):
+        print(f"\r{n:,} rows · {n/max(s, 1e-9):,.0f} rows/s", end='', file=sys.stderr, flush=True)
+
+    n, s = score_file(args.input, args.output, args.chunksize, args.workers, args.data, progress)
+    print(f"\rscored {n:,} rows in {s:.2f}s · {n/max(s, 1e-9):,.0f} rows/s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from ingest import INC_RANGE, SCHEMA_VERSION, SPD_RANGE, compact, load_or_fit_file, read_customers
+from store import attach_dataset, closest, load_or_fit, save_dataset, shared_arrays
+from training import train, train_config
+
+KMEANS_PARAMS = dict(n_clusters=5, random_state=42, n_init=15)
+
+# SEGMENTIQ_DATA points at a customer CSV/Parquet export; unset → synthetic demo data
+DATA_PATH = os.environ.get("SEGMENTIQ_DATA")
+
+META = [
+    {'name':'Budget Enthusiasts','short':'Budget',   'tag':'Low income · Low spend',
+     'color':'#F87171','dim':'rgba(248,113,113,0.12)','brd':'rgba(248,113,113,0.3)',
+     'strategy':'Flash sales & price-drop alerts'},
+    {'name':'Impulsive Spenders', 'short':'Impulsive','tag':'Low income · High spend',
+     'color':'#FBBF24','dim':'rgba(251,191,36,0.12)','brd':'rgba(251,191,36,0.3)',
+     'strategy':'BNPL options & curated impulse picks'},
+    {'name':'Standard Customers', 'short':'Standard', 'tag':'Mid income · Mid spend',
+     'color':'#34D399','dim':'rgba(52,211,153,0.12)','brd':'rgba(52,211,153,0.3)',
+     'strategy':'Seasonal campaigns & email promos'},
+    {'name':'Target Customers',   'short':'Target',  'tag':'High income · High spend',
+     'color':'#60A5FA','dim':'rgba(96,165,250,0.12)','brd':'rgba(96,165,250,0.3)',
+     'strategy':'Premium bundles & VIP early access'},
+    {'name':'Cautious Savers',    'short':'Cautious', 'tag':'High income · Low spend',
+     'color':'#A78BFA','dim':'rgba(167,139,250,0.12)','brd':'rgba(167,139,250,0.3)',
+     'strategy':'Value messaging & exclusive ROI offers'},
+]
+
+def synthetic():
+    np.random.seed(42)
+    n = 200
+    income_raw = np.concatenate([
+        np.random.normal(25,8,40), np.random.normal(25,8,40),
+        np.random.normal(55,10,40), np.random.normal(85,10,40), np.random.normal(85,10,40)
+    ])
+    spending_raw = np.concatenate([
+        np.random.normal(20,10,40), np.random.normal(75,10,40),
+        np.random.normal(50,10,40), np.random.normal(80,10,40), np.random.normal(20,10,40)
+    ])
+    age_raw    = np.random.randint(18, 70, n)
+    gender_raw = np.random.choice(["Male","Female"], n)
+    inc = np.clip(income_raw, 15, 137)
+    spd = np.clip(spending_raw, 1, 100)
+    return pd.DataFrame({'Income':inc,'Spending':spd,'Age':age_raw,'Gender':gender_raw})
+
+
+def load_model(path=DATA_PATH):
+    if path:
+        return load_or_fit_file(path, KMEANS_PARAMS)
+    X = synthetic()[['Income','Spending']].to_numpy(np.float64)
+    return load_or_fit(X, train_config(KMEANS_PARAMS, len(X)), train)
+
+
+def load_customers(km, sc, path=DATA_PATH):
+    if path:
+        return read_customers(path, km, sc)
+    df = synthetic()
+    df['Cluster'] = km.predict(sc.transform(df[['Income','Spending']].to_numpy(np.float64)))
+    return compact(df)
+
+
+def model_version(km, sc):
+    return hashlib.sha1(np.concatenate([sc.mean_, sc.scale_, km.cluster_centers_.ravel()]).tobytes()).hexdigest()[:12]
+
+
+def build_lut(km, sc):
+    # every integer slider input → cluster, so the UI never calls sklearn per rerun
+    gi, gs = np.meshgrid(np.arange(INC_RANGE[0], INC_RANGE[1]+1),
+                         np.arange(SPD_RANGE[0], SPD_RANGE[1]+1), indexing='ij')
+    lut = km.predict(sc.transform(np.column_stack([gi.ravel(), gs.ravel()]))).astype(np.int8).reshape(gi.shape)
+    lut.flags.writeable = False
+    return lut
+
+
+# plain-numpy KMeans.predict on raw inputs: scale, then store.closest
+def nearest_centroid(centres, mean, scale, incomes, spendings):
+    return closest(centres, (np.column_stack([incomes, spendings]) - mean) / scale)
+
+
+# the first process to start materialises the labelled frame; the rest map it.
+# The files follow compact()'s schema as well as the model, so both go in the
+# key; indexes built from the frame are shared under it via attrs
+def shared_customers(km, sc, key, path=DATA_PATH):
+    dkey = f"{key}-s{SCHEMA_VERSION}"
+    df   = attach_dataset(dkey)
+    if df is None:
+        # a read-only store can't take it: serve the frame just built
+        built = load_customers(km, sc, path)
+        save_dataset(dkey, built)
+        df = attach_dataset(dkey)
+        if df is None:
+            return built
+    df.attrs['dataset_key'] = dkey
+    return df
+
+
+def build(path=DATA_PATH):
+    km, sc, key = load_model(path)
+    df = shared_customers(km, sc, key, path)
+    df.attrs['model_key'] = key     # where the training report is stored
+    centers = sc.inverse_transform(km.cluster_centers_)
+    return km, sc, df, centers, META, build_lut(km, sc), model_version(km, sc)
+
+
+# one pass over the frame for every per-cluster number the pages show;
+# `rows` holds each cluster's row positions so charts can slice without masks
+def aggregates(df, k=KMEANS_PARAMS['n_clusters']):
+    g  = df.groupby('Cluster')
+    by = g[['Income','Spending','Age']].agg(['mean','std','min','max'])
+    by.columns = [f'{c}_{s}' for c, s in by.columns]
+    q  = g['Age'].quantile([.25, .5, .75]).unstack()
+    by['Age_q1'], by['Age_median'], by['Age_q3'] = q[.25], q[.5], q[.75]
+    # box whiskers end at the furthest real ages inside the 1.5·IQR fences
+    lab, age = df['Cluster'].to_numpy(), df['Age'].to_numpy()
+    iqr   = (q[.75] - q[.25]).reindex(range(k)).to_numpy()
+    lo    = (q[.25].reindex(range(k)).to_numpy() - 1.5*iqr)[lab]
+    hi    = (q[.75].reindex(range(k)).to_numpy() + 1.5*iqr)[lab]
+    fence = (age >= lo) & (age <= hi)
+    w = df['Age'].where(fence).groupby(df['Cluster']).agg(['min', 'max'])
+    by['Age_whislo'], by['Age_whishi'] = w['min'], w['max']
+    by['Age_outliers'] = pd.Series(~fence).groupby(df['Cluster'].to_numpy()).sum()
+    by['count'] = g.size()
+    by = by.join(pd.crosstab(df['Cluster'], df['Gender'])).reindex(range(k))
+    for c in ('count', 'Female', 'Male', 'Age_outliers'):
+        if c not in by:
+            by[c] = 0
+        by[c] = by[c].fillna(0).astype(np.int64)
+    tot = {
+        'count': len(df), 'Income_mean': df['Income'].mean(), 'Spending_mean': df['Spending'].mean(),
+        'Age_mean': df['Age'].mean(), 'Female': int(by['Female'].sum()), 'Male': int(by['Male'].sum()),
+    }
+    ix    = shared_arrays(df.attrs.get('dataset_key'), f"index-rows-k{k}", lambda: _cluster_order(df, k))
+    order, edges = ix['order'], ix['edges']
+    rows  = [order[edges[i]:edges[i+1]] for i in range(k)]
+    return by, tot, rows
+
+
+def _cluster_order(df, k):
+    lab   = df['Cluster'].to_numpy()
+    order = np.argsort(lab, kind='stable')
+    return {'order': order, 'edges': np.searchsorted(lab[order], np.arange(k+1))}
@@ -0,0 +1,73 @@
+# Warm every process-wide cache, then start the Streamlit server in the same
+# process, so the first visitor hits the same caches as the hundredth:
+#   python serve.py --port 8501
+# The server (and so /_stcore/health) only comes up once warm-up is done.
+import argparse
+import logging
+import runpy
+import sys
+import time
+from pathlib import Path
+
+import startup
+
+APP   = Path(__file__).resolve().with_name("app.py")
+PAGES = ["overview", "profiler", "segments", "simulator", "data"]
+
+log = logging.getLogger("segmentiq.warmup")
+
+
+def _run_page(page):
+    import streamlit as st
+    # bare mode: no server, widgets return their defaults, but st.cache_resource
+    # fills the same global caches the server's script runs read
+    st.session_state.page = page
+    return runpy.run_path(str(APP), run_name="__main__")
+
+
+def warm():
+    timings = {}
+    logging.disable(logging.WARNING)    # bare-mode "no ScriptRunContext" noise
+    try:
+        for i, page in enumerate(PAGES):
+            t = time.perf_counter()
+            g = _run_page(page)
+            timings[f"page {page}" + (" (all above)" if i == 0 else "")] = (time.perf_counter() - t) * 1000
+        # figures keyed by a widget value the default run did not reach
+        t = time.perf_counter()
+        v = g['model_version']
+        for sel in range(len(g['meta'])):
+            g['cluster_map'](v, sel, 260)
+            g['segment_histogram'](v, 'Income', sel)
+            g['segment_histogram'](v, 'Spending', sel)
+            g['age_spending'](v, sel)
+        timings["segment figures"] = (time.perf_counter() - t) * 1000
+    finally:
+        logging.disable(logging.NOTSET)
+    r = startup.report()
+    stages = {'imports': r['imports'], 'model + aggregates': r['model_ready'] - r['first_paint'], **timings}
+    for name, ms in stages.items():
+        log.info("warm-up %-32s %8.0f ms", name, ms)
+    return stages
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Warm SegmentIQ's caches, then serve it.")
+    ap.add_argument('--port', type=int)
+    ap.add_argument('--address')
+    ap.add_argument('--no-warm', action='store_true', help="start serving immediately")
+    args = ap.parse_args(argv)
+
+    from streamlit.web import bootstrap
+    flags = {'server_port': args.port, 'server_address': args.address}
+    bootstrap.load_config_options(flag_options=flags)
+    if not args.no_warm:
+        t = time.perf_counter()
+        stages = warm()
+        print("\n".join(f"  {k:<32} {v:8.0f} ms" for k, v in stages.items()), file=sys.stderr)
+        print(f"warm-up done in {time.perf_counter() - t:.2f}s", file=sys.stderr)
+    bootstrap.run(str(APP), False, [], flags)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+import logging
+import os
+import sys
+import time
+
+log = logging.getLogger("segmentiq.startup")
+
+# neither Streamlit nor the root logger passes INFO on, so the segmentiq.*
+# loggers (startup, timing, memory, payload, training) get their own stdout
+# handler; SEGMENTIQ_LOG_LEVEL=WARNING quietens them
+_root = logging.getLogger("segmentiq")
+if not _root.handlers:
+    _h = logging.StreamHandler(sys.stdout)
+    _h.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+    _root.addHandler(_h)
+    _root.setLevel(os.environ.get("SEGMENTIQ_LOG_LEVEL", "INFO").upper())
+    _root.propagate = False
+
+# app.py imports this first, so the clock starts before its heavy imports
+T0 = time.perf_counter()
+
+_marks = {}
+
+
+# first time each stage is reached in this process, in ms since T0; later
+# reruns and sessions don't move them
+def mark(stage):
+    if stage not in _marks:
+        _marks[stage] = (time.perf_counter() - T0) * 1000
+        log.info("%s after %.0f ms", stage, _marks[stage])
+
+
+def report():
+    return {**_marks, 'sklearn_imported': 'sklearn' in sys.modules}
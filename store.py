@@ -0,0 +1,277 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# bump when the on-disk layout or the fit procedure changes
+STORE_VERSION = 1
+ARTIFACT_DIR  = Path(os.environ.get("SEGMENTIQ_ARTIFACTS", Path(__file__).parent / "artifacts"))
+
+# the notebook's file names, but only artifacts written by save_artifacts()
+# load: they need a manifest with matching checksums, and bare notebook
+# pickles are treated as a miss
+MODEL_FILE  = "kmeans_model.pkl"
+SCALER_FILE = "customer_scaler.pkl"
+CENTROIDS_FILE = "centroids.npz"
+MANIFEST    = "manifest.json"
+
+
+def key_for(digest, params):
+    h = hashlib.sha256(digest.encode())
+    h.update(json.dumps(params, sort_keys=True).encode())
+    h.update(f"store={STORE_VERSION}".encode())
+    return h.hexdigest()[:16]
+
+
+def artifact_key(X, params):
+    return key_for(hashlib.sha256(np.ascontiguousarray(X, dtype=np.float64).tobytes()).hexdigest(), params)
+
+
+# a cheap identity for a data file, so a warm start doesn't re-read it: size,
+# mtime and the bytes of SAMPLES evenly spaced blocks (both ends included);
+# files up to SAMPLES blocks are hashed whole
+SAMPLES, BLOCK = 16, 1 << 16
+
+def file_digest(path):
+    st = os.stat(path)
+    h  = hashlib.sha256(f"{st.st_size}:{st.st_mtime_ns}".encode())
+    with open(path, "rb") as f:
+        if st.st_size <= SAMPLES * BLOCK:
+            h.update(f.read())
+        else:
+            for off in np.linspace(0, st.st_size - BLOCK, SAMPLES).astype(np.int64):
+                f.seek(int(off))
+                h.update(f.read(BLOCK))
+    return h.hexdigest()
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# the scoring rule everything shares (Centroids, the LUT's fallback, score.py):
+# KMeans.predict is the argmin of squared distance to the centres, in scaled space
+def closest(centres, Xs):
+    return ((Xs[:, None, :] - centres[None, :, :])**2).sum(axis=2).argmin(axis=1)
+
+
+# the fitted state scoring needs, as plain arrays with the KMeans/StandardScaler
+# methods the app and score.py call; loading these never imports sklearn
+class Centroids:
+    def __init__(self, cluster_centers_):
+        self.cluster_centers_ = cluster_centers_
+        self.n_clusters = len(cluster_centers_)
+
+    def predict(self, Xs):
+        return closest(self.cluster_centers_, Xs)
+
+
+class Scaler:
+    def __init__(self, mean_, scale_):
+        self.mean_, self.scale_ = mean_, scale_
+
+    def transform(self, X):
+        return (X - self.mean_) / self.scale_
+
+    def inverse_transform(self, Xs):
+        return Xs * self.scale_ + self.mean_
+
+
+# lite=True returns Centroids/Scaler from the .npz when the artifact has one;
+# otherwise the pickled estimators, which must match the installed sklearn
+def load_artifacts(key, root=ARTIFACT_DIR, lite=False):
+    d = Path(root) / key
+    try:
+        man = json.loads((d / MANIFEST).read_text())
+    except (OSError, ValueError):
+        return None
+    if man.get("key") != key or man.get("store_version") != STORE_VERSION:
+        return None
+    files = man.get("files", {})
+    lite  = lite and CENTROIDS_FILE in files
+    if not lite:
+        import sklearn
+        if man.get("sklearn") != sklearn.__version__:
+            return None
+    for name in ([CENTROIDS_FILE] if lite else [MODEL_FILE, SCALER_FILE]):
+        if name not in files or not (d / name).is_file() or _sha256(d / name) != files[name]:
+            return None
+    try:
+        if lite:
+            with np.load(d / CENTROIDS_FILE) as z:
+                return Centroids(z['centres']), Scaler(z['mean'], z['scale'])
+        import joblib
+        return joblib.load(d / MODEL_FILE), joblib.load(d / SCALER_FILE)
+    except Exception:
+        return None
+
+
+# `report` is the fit's training report (mode, rows, fit or per-epoch times);
+# it is kept in the manifest so it outlives the process that trained
+def save_artifacts(key, km, sc, params, root=ARTIFACT_DIR, report=None):
+    root = Path(root)
+    tmp  = None
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=root))
+        import joblib
+        import sklearn
+        joblib.dump(km, tmp / MODEL_FILE)
+        joblib.dump(sc, tmp / SCALER_FILE)
+        with open(tmp / CENTROIDS_FILE, "wb") as f:
+            np.savez(f, centres=km.cluster_centers_, mean=sc.mean_, scale=sc.scale_)
+        (tmp / MANIFEST).write_text(json.dumps({
+            "key": key, "store_version": STORE_VERSION, "sklearn": sklearn.__version__,
+            "params": params, "report": report,
+            "files": {n: _sha256(tmp / n) for n in (MODEL_FILE, SCALER_FILE, CENTROIDS_FILE)},
+        }, indent=2))
+        dest = root / key
+        if dest.exists():
+            shutil.rmtree(dest, ignore_errors=True)
+        os.replace(tmp, dest)
+    except OSError:
+        # another replica won the race, or the volume is read-only: serve from memory
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+def training_report(key, root=ARTIFACT_DIR):
+    try:
+        return json.loads((Path(root) / key / MANIFEST).read_text()).get("report")
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+# fit(X, params) returns (km, sc, report), like training.train
+def load_or_fit(X, params, fit, root=ARTIFACT_DIR):
+    key = artifact_key(X, params)
+    hit = load_artifacts(key, root, lite=True)
+    if hit is not None:
+        return (*hit, key)
+    km, sc, report = fit(X, params)
+    save_artifacts(key, km, sc, params, root, report)
+    return km, sc, key
+
+
+# ── shared dataset ─────────────────────────────────────────────
+# one .npy per column; every server process maps the same files read-only,
+# so the OS keeps a single copy of the pages however many workers attach
+def save_dataset(key, df, root=ARTIFACT_DIR):
+    root = Path(root)
+    tmp  = None
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        tmp  = Path(tempfile.mkdtemp(prefix=f".data-{key}-", dir=root))
+        cols = {}
+        for c in df.columns:
+            s = df[c]
+            if isinstance(s.dtype, pd.CategoricalDtype):
+                np.save(tmp / f"{c}.npy", np.ascontiguousarray(s.array.codes))
+                cols[c] = {'categories': [str(x) for x in s.cat.categories]}
+            else:
+                np.save(tmp / f"{c}.npy", np.ascontiguousarray(s.to_numpy()))
+                cols[c] = {}
+        (tmp / MANIFEST).write_text(json.dumps({
+            'key': key, 'store_version': STORE_VERSION, 'rows': len(df), 'columns': cols,
+            'files': {f"{c}.npy": _sha256(tmp / f"{c}.npy") for c in cols},
+        }, indent=2))
+        dest = root / f"data-{key}"
+        if dest.exists():
+            shutil.rmtree(dest, ignore_errors=True)
+        os.replace(tmp, dest)
+    except OSError:
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+def attach_dataset(key, root=ARTIFACT_DIR, verify=False):
+    d = Path(root) / f"data-{key}"
+    try:
+        man = json.loads((d / MANIFEST).read_text())
+    except (OSError, ValueError):
+        return None
+    if man.get('key') != key or man.get('store_version') != STORE_VERSION:
+        return None
+    # hashing every page would defeat the point of mapping them; the size
+    # check catches truncation, verify=True does the full checksum
+    cols = {}
+    try:
+        for c, spec in man['columns'].items():
+            f = d / f"{c}.npy"
+            if verify and _sha256(f) != man['files'][f"{c}.npy"]:
+                return None
+            a = np.load(f, mmap_mode='r')
+            if len(a) != man['rows']:
+                return None
+            cols[c] = pd.Categorical.from_codes(a, categories=spec['categories']) if 'categories' in spec else a
+    except (OSError, ValueError, KeyError):
+        return None
+    return pd.DataFrame(cols, copy=False)
+
+
+# ── shared derived arrays ──────────────────────────────────────
+# indexes built from the shared frame (cluster row lists, explorer sort
+# orders) are mapped the same way: a nested dict/list of arrays is written as
+# one .npy per leaf under <name>-<key>/, with the nesting in the manifest and
+# plain numbers stored inline
+def _save_tree(tree, d, path=()):
+    if isinstance(tree, np.ndarray):
+        f = ".".join(path) + ".npy"
+        np.save(d / f, np.ascontiguousarray(tree))
+        return {'npy': f, 'shape': list(tree.shape)}
+    if isinstance(tree, dict):
+        return {'dict': {k: _save_tree(v, d, path + (str(k),)) for k, v in tree.items()}}
+    if isinstance(tree, (list, tuple)):
+        return {'list': [_save_tree(v, d, path + (str(i),)) for i, v in enumerate(tree)]}
+    return {'value': tree.item() if isinstance(tree, np.generic) else tree}
+
+
+def _attach_tree(spec, d):
+    if 'npy' in spec:
+        a = np.load(d / spec['npy'], mmap_mode='r')
+        if list(a.shape) != spec['shape']:
+            raise ValueError(f"{spec['npy']}: truncated")
+        return a
+    if 'dict' in spec:
+        return {k: _attach_tree(v, d) for k, v in spec['dict'].items()}
+    if 'list' in spec:
+        return [_attach_tree(v, d) for v in spec['list']]
+    return spec['value']
+
+
+def shared_arrays(key, name, build, root=ARTIFACT_DIR):
+    if key is None:
+        return build()
+    root = Path(root)
+    d    = root / f"{name}-{key}"
+    try:
+        man = json.loads((d / MANIFEST).read_text())
+        if man.get('key') == key and man.get('store_version') == STORE_VERSION:
+            return _attach_tree(man['tree'], d)
+    except (OSError, ValueError, KeyError):
+        pass
+    tree = build()
+    tmp  = None
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f".{name}-{key}-", dir=root))
+        (tmp / MANIFEST).write_text(json.dumps({
+            'key': key, 'store_version': STORE_VERSION, 'tree': _save_tree(tree, tmp),
+        }, indent=2))
+        if d.exists():
+            shutil.rmtree(d, ignore_errors=True)
+        os.replace(tmp, d)
+        return _attach_tree(json.loads((d / MANIFEST).read_text())['tree'], d)
+    except (OSError, ValueError, KeyError):
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+        return tree
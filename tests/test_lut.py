@@ -0,0 +1,74 @@
+# The Simulator's lookup table against sklearn, and classify()'s choice
+# between the table and the nearest-centroid fallback
+import logging
+import runpy
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="module")
+def app(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("SEGMENTIQ_ARTIFACTS", str(tmp_path_factory.mktemp("artifacts")))
+        mp.delenv("SEGMENTIQ_DATA", raising=False)
+        mp.syspath_prepend(str(ROOT))
+        logging.disable(logging.WARNING)
+        try:
+            yield runpy.run_path(str(ROOT / "app.py"), run_name="__main__")
+        finally:
+            logging.disable(logging.NOTSET)
+
+
+def predict(app, inc, spd):
+    X = np.column_stack([np.ravel(inc), np.ravel(spd)]).astype(float)
+    return app['km'].predict(app['sc'].transform(X))
+
+
+def test_lut_matches_predict_on_every_integer_input(app):
+    from ingest import INC_RANGE, SPD_RANGE
+    from segmentation import build_lut
+
+    lut = build_lut(app['km'], app['sc'])
+    assert lut.shape == (123, 100)
+    gi, gs = np.meshgrid(np.arange(INC_RANGE[0], INC_RANGE[1]+1),
+                         np.arange(SPD_RANGE[0], SPD_RANGE[1]+1), indexing='ij')
+    np.testing.assert_array_equal(lut, predict(app, gi, gs).reshape(lut.shape))
+    np.testing.assert_array_equal(app['lut'], lut)
+
+
+@pytest.fixture
+def fallback(app, monkeypatch):
+    calls = []
+    real  = app['nearest_centroid']
+    def spy(incomes, spendings):
+        calls.append((list(incomes), list(spendings)))
+        return real(incomes, spendings)
+    monkeypatch.setitem(app['classify'].__globals__, 'nearest_centroid', spy)
+    return calls
+
+
+@pytest.mark.parametrize("inc, spd", [(15, 1), (65, 50), (137, 100), (65.0, 50.0)])
+def test_classify_reads_the_lut_on_grid(app, fallback, inc, spd):
+    assert app['classify'](inc, spd) == predict(app, inc, spd)[0]
+    assert fallback == []
+
+
+@pytest.mark.parametrize("inc, spd", [
+    (65.5, 50), (65, 50.25), (65.5, 50.5),          # between grid points
+    (14, 50), (138, 50), (65, 0), (65, 101),        # off the ends
+    (200.0, 150.0), (-5, -5),
+])
+def test_classify_falls_back_to_nearest_centroid(app, fallback, inc, spd):
+    assert app['classify'](inc, spd) == predict(app, inc, spd)[0]
+    assert fallback == [([inc], [spd])]
+
+
+def test_classify_many_splits_hits_and_misses(app, fallback):
+    inc = np.array([65, 65.5, 14, 137, 90])
+    spd = np.array([50, 50, 50, 100, 101])
+    np.testing.assert_array_equal(app['classify_many'](inc, spd), predict(app, inc, spd))
+    assert [c[0] for c in fallback] == [[65.5, 14, 90]]
@@ -0,0 +1,49 @@
+# Memory budgets at a small reference size, so they run with the test suite;
+# benchmarks/bench_budgets.py checks the same figures at 1M rows. The app runs
+# in a fresh interpreter under tracemalloc (see bench_budgets.measure): caches
+# are process-wide and tracing has to start before the app's imports.
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+import bench_budgets  # noqa: E402
+
+REF_ROWS = 20_000
+BUDGETS  = {                 # MB at REF_ROWS, with headroom
+    'first_peak':    96,     # Segments' k sweep (~66) and the first run's lazy imports (~51)
+    'warm_retained':  2,
+    'warm_peak':      4,
+    'hammer_peak':    6,
+    'hammer_leak':    3,
+    'cached_total':   4,     # model, df and every st.cache_resource entry (~2.3)
+}
+
+
+@pytest.fixture(scope="module")
+def result():
+    return bench_budgets.probe(REF_ROWS)
+
+
+@pytest.mark.parametrize("page", bench_budgets.PAGES)
+def test_page_runs(result, page):
+    p = result['pages'][page]
+    assert p['first_peak'] <= BUDGETS['first_peak']
+    assert p['warm_retained'] <= BUDGETS['warm_retained']
+    assert p['warm_peak'] <= BUDGETS['warm_peak']
+
+
+def test_filter_changes(result):
+    h = result['hammer']
+    assert h['peak'] <= BUDGETS['hammer_peak']
+    assert h['leak'] <= BUDGETS['hammer_leak'], "second pass over the same filters grew"
+
+
+# measured after the sweep through more filter states than the largest
+# max_entries, so a per-state cache that grows with them shows up here
+def test_cached_total(result):
+    assert result['sweep'] > 64
+    assert result['cached_total'] <= BUDGETS['cached_total'], result['cached']
+    assert result['cached']['load']['entries'] == 1
+    assert result['cached']['filtered_rows']['entries'] <= 4
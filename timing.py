@@ -0,0 +1,93 @@
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+import payload
+
+log = logging.getLogger("segmentiq.timing")
+
+KEEP = 500        # runs kept per page and per panel
+
+_lock  = threading.Lock()
+_runs  = defaultdict(lambda: deque(maxlen=KEEP))
+_local = threading.local()    # the script thread's current run
+
+
+# ── PER RUN ───────────────────────────────────────────────────
+# each script run (and each fragment rerun) gets its own thread, so the
+# panels drawn so far live in a thread-local; a fragment rerun starts empty
+def _state():
+    d = _local.__dict__
+    d.setdefault('panels', [])
+    d.setdefault('stack', [])
+    return d
+
+
+def start():
+    _local.panels, _local.stack, _local.t0, _local.sent = [], [], time.perf_counter(), payload.mark()
+
+
+def _emit(event, rec):
+    with _lock:
+        _runs[rec['key']].append(rec['ms'])
+    log.info(json.dumps({'event': event, **rec}))
+
+
+# wall time of a block of the page, split into render (inside chart():
+# figure serialisation and send) and compute (everything else: data and
+# figure build), plus the bytes it sent
+@contextmanager
+def panel(page, name):
+    s = _state()
+    rec  = {'key': f"{page}/{name}", 'page': page, 'panel': name, 'render_ms': 0.0}
+    sent = payload.mark()
+    s['stack'].append(rec)
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        rec['ms'] = round((time.perf_counter() - t) * 1000, 2)
+        s['stack'].pop()
+        rec['render_ms']  = round(rec['render_ms'], 2)
+        rec['compute_ms'] = round(rec['ms'] - rec['render_ms'], 2)
+        now = payload.mark()
+        rec['bytes'] = now - sent if sent is not None and now is not None else None
+        s['panels'].append(rec)
+        _emit('panel', rec)
+
+
+# adds the block's time to the innermost open panel as <name>_ms
+@contextmanager
+def phase(name):
+    s = _state()
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        if s['stack']:
+            rec = s['stack'][-1]
+            rec[f'{name}_ms'] = rec.get(f'{name}_ms', 0.0) + (time.perf_counter() - t) * 1000
+
+
+# the whole run, from start(); returns it with the panels it drew
+def finish(page):
+    s   = _state()
+    now = payload.mark()
+    rec = {'key': page, 'page': page, 'ms': round((time.perf_counter() - s['t0']) * 1000, 2),
+           'bytes': now - s['sent'] if s['sent'] is not None and now is not None else None,
+           'panels': len(s['panels'])}
+    _emit('page', rec)
+    return rec, list(s['panels'])
+
+
+def summary():
+    with _lock:
+        runs = {k: list(v) for k, v in _runs.items()}
+    return {k: {'runs': len(v), 'last': v[-1], 'p50': float(np.percentile(v, 50)),
+                'p95': float(np.percentile(v, 95)), 'max': max(v)}
+            for k, v in runs.items() if v}
@@ -0,0 +1,130 @@
+import logging
+import os
+import time
+
+import numpy as np
+
+log = logging.getLogger("segmentiq.training")
+
+# "auto" keeps exact full-batch KMeans for small data and switches to
+# out-of-core mini-batch partial fits once the matrix gets large
+TRAIN_MODE  = os.environ.get("SEGMENTIQ_TRAIN_MODE", "auto")
+BATCH_SIZE  = int(os.environ.get("SEGMENTIQ_BATCH_SIZE", 65_536))
+EPOCHS      = int(os.environ.get("SEGMENTIQ_EPOCHS", 3))
+AUTO_ROWS   = 1_000_000
+INIT_ROWS   = 100_000     # uniform sample the mini-batch centroids are seeded from
+POOL_ROWS   = 1_000_000   # rows whose batches are drawn in random order
+
+
+def train_config(params, n_rows=None, mode=TRAIN_MODE, batch_size=BATCH_SIZE, epochs=EPOCHS):
+    if mode == "auto":
+        mode = "full" if n_rows is not None and n_rows <= AUTO_ROWS else "minibatch"
+    if mode not in ("full", "minibatch"):
+        raise ValueError(f"unknown training mode: {mode!r}")
+    cfg = dict(params, mode=mode)
+    if mode == "minibatch":
+        cfg.update(batch_size=batch_size, epochs=epochs)
+    return cfg
+
+
+def iter_batches(X, batch_size):
+    for i in range(0, len(X), batch_size):
+        yield X[i:i+batch_size]
+
+
+# sklearn is imported by the fits themselves: a process serving a persisted
+# model never pays for it
+def fit_full(X, cfg):
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import StandardScaler
+    t = time.perf_counter()
+    sc = StandardScaler()
+    km = KMeans(n_clusters=cfg['n_clusters'], random_state=cfg.get('random_state'), n_init=cfg.get('n_init', 'auto'))
+    km.fit(sc.fit_transform(X))
+    report = {'mode': 'full', 'rows': len(X), 'fit_s': time.perf_counter() - t, 'inertia': float(km.inertia_)}
+    log.info("full-batch fit: %d rows in %.2fs", len(X), report['fit_s'])
+    return km, sc, report
+
+
+# uniform sample of up to `size` rows from one pass over the chunks: keep the
+# rows with the smallest random priorities seen so far
+def reservoir(chunks, size, rng, each=None):
+    keep = pri = None
+    for X in chunks():
+        if each is not None:
+            each(X)
+        p = rng.random(len(X))
+        if keep is not None:
+            X, p = np.concatenate([keep, X]), np.concatenate([pri, p])
+        if len(X) > size:
+            i = np.argpartition(p, size)[:size]
+            X, p = X[i], p[i]
+        keep, pri = X, p
+    return keep
+
+
+# batches drawn from a row-level shuffle pool of about POOL_ROWS: each time it
+# fills, it is shuffled, all but half is sent and the rest mixes with the next
+# chunks, so a file sorted by any column doesn't feed one region at a time
+def shuffled_batches(chunks, batch_size, rng, pool_rows=POOL_ROWS):
+    pool = None
+    for X in chunks():
+        pool = X if pool is None else np.concatenate([pool, X])
+        if len(pool) >= pool_rows:
+            pool = pool[rng.permutation(len(pool))]
+            cut  = len(pool) - pool_rows // 2
+            yield from iter_batches(pool[:cut], batch_size)
+            pool = pool[cut:]
+    if pool is not None:
+        yield from iter_batches(pool[rng.permutation(len(pool))], batch_size)
+
+
+# `chunks` is a zero-arg callable returning a fresh iterator of raw (n, 2)
+# arrays, so an epoch can re-read an in-memory matrix or a file alike; pass a
+# scaler already partial-fitted by the caller to skip fitting one. Centroids
+# start from k-means++ on a uniform sample, not from the first batch
+def fit_minibatch(chunks, cfg, sc=None):
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+    from sklearn.preprocessing import StandardScaler
+    bs  = cfg['batch_size']
+    rng = np.random.default_rng(cfg.get('random_state'))
+    t   = time.perf_counter()
+    fit_sc = sc is None
+    if fit_sc:
+        sc = StandardScaler()
+    sample = reservoir(chunks, INIT_ROWS, rng, each=sc.partial_fit if fit_sc else None)
+    init = KMeans(n_clusters=cfg['n_clusters'], random_state=cfg.get('random_state'),
+                  n_init=cfg.get('n_init', 'auto')).fit(sc.transform(sample)).cluster_centers_
+    n  = int(sc.n_samples_seen_)
+    report = {'mode': 'minibatch', 'rows': n, 'batch_size': bs, 'init_s': time.perf_counter() - t, 'epochs_s': []}
+    km = MiniBatchKMeans(n_clusters=cfg['n_clusters'], random_state=cfg.get('random_state'),
+                         init=init, n_init=1, batch_size=bs, reassignment_ratio=0)
+    # the sample's counts weight the seeded centres, so the first batches of a
+    # sorted file can't drag them into one region; with no reassignment, a
+    # centre that sees no points for a while (its region not reached yet)
+    # isn't moved onto the current batch
+    km.partial_fit(sc.transform(sample))
+    for epoch in range(cfg['epochs']):
+        t = time.perf_counter()
+        for B in shuffled_batches(chunks, bs, rng):
+            if len(B) >= km.n_clusters:
+                km.partial_fit(sc.transform(B))
+        report['epochs_s'].append(time.perf_counter() - t)
+        log.info("mini-batch epoch %d/%d: %d rows in %.2fs", epoch+1, cfg['epochs'], n, report['epochs_s'][-1])
+    return km, sc, report
+
+
+def train(X, cfg):
+    if cfg['mode'] == "full":
+        return fit_full(X, cfg)
+    # in memory an epoch can also visit the blocks in a random order
+    rng = np.random.default_rng(cfg.get('random_state'))
+    starts = np.arange(0, len(X), POOL_ROWS)
+    return fit_minibatch(lambda: (X[i:i+POOL_ROWS] for i in rng.permutation(starts)), cfg)
+
+
+def inertia(km, sc, chunks):
+    total = 0.0
+    for X in chunks():
+        total += -km.score(sc.transform(X))
+    return total